@@ -1,12 +1,11 @@
 import collections
-import functools
 import binascii
 import pathlib
 import fnmatch
 import io
 import os
 
-from .util import reify
+from .util import reify, backend_cache
 
 
 class GitPathError(Exception):
@@ -49,7 +48,6 @@ def get_default_backend():
 GIT_MODE_LINK = 0o120000
 
 
-@functools.total_ordering
 class BaseGitPath:
     """
     A `pathlib`_-style *path flavor* that allows reading from Git repositories.
@@ -249,18 +247,39 @@ class BaseGitPath:
         else:
             return self.parent._gp_root
 
+    @reify
+    def _gp_eq_key(self):
+        return (self.root, *self.parts[1:])
+
     def __hash__(self):
-        return hash((BaseGitPath, eq_key(self)))
+        return hash((BaseGitPath, self._gp_eq_key))
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, BaseGitPath):
             return NotImplemented
-        return eq_key(self) == eq_key(other)
+        return self._gp_eq_key == other._gp_eq_key
 
     def __lt__(self, other):
         if not isinstance(other, BaseGitPath):
             return NotImplemented
-        return eq_key(self) < eq_key(other)
+        return self._gp_eq_key < other._gp_eq_key
+
+    def __le__(self, other):
+        if not isinstance(other, BaseGitPath):
+            return NotImplemented
+        return self._gp_eq_key <= other._gp_eq_key
+
+    def __gt__(self, other):
+        if not isinstance(other, BaseGitPath):
+            return NotImplemented
+        return self._gp_eq_key > other._gp_eq_key
+
+    def __ge__(self, other):
+        if not isinstance(other, BaseGitPath):
+            return NotImplemented
+        return self._gp_eq_key >= other._gp_eq_key
 
     def __repr__(self):
         qualname = '{tp.__module__}.{tp.__qualname__}'.format(tp=type(self))
@@ -420,7 +439,7 @@ class BaseGitPath:
         backend = path._gp_backend
         oid_hex = backend.hex(path)
         inode = int.from_bytes(binascii.unhexlify(oid_hex), 'little')
-        if backend.get_type(self) == 'blob':
+        if backend.get_type(path) == 'blob':
             st_size = backend.get_blob_size(path)
         else:
             st_size = len(backend.listdir(path))
@@ -750,6 +769,8 @@ class BaseGitPath:
         if not isinstance(other_path, BaseGitPath):
             return False
         path1 = resolve(self, strict=True)
+        if other_path is self:
+            return True
         path2 = resolve(other_path, strict=True)
         return hex_oid(path1) == hex_oid(path2)
 
@@ -806,13 +827,9 @@ PathInfo = collections.namedtuple(
     ['exists', 'canonical', 'link_target'])
 
 
+@backend_cache('_gp_info')
 def get_info(path):
-    try:
-        return path._gp_info
-    except AttributeError:
-        result = _get_info(path)
-        path._gp_info = result
-        return result
+    return _get_info(path)
 
 
 def _get_info(path):
@@ -884,10 +901,6 @@ def _glob(path, part=None, *more_parts, seen):
                     yield from _glob(child, *more_parts, seen=set())
 
 
-def eq_key(gitpath):
-    return (gitpath.root, *gitpath.parts[1:])
-
-
 def good_part_name(name):
     if '/' in name or '\0' in name or not name:
         return False
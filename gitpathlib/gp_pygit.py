@@ -1,10 +1,12 @@
 import functools
 import pathlib
+import sys
 
 import pygit2
 from pygit2.enums import ObjectType
 
 from .gp_base import NotATreeError, NotABlobError
+from .util import backend_cache
 
 GIT_TYPES = {
     ObjectType.COMMIT: 'commit',
@@ -13,26 +15,34 @@ GIT_TYPES = {
     ObjectType.TAG: 'tag',
 }
 
+class _RootState:
+    """Shared per-root state, referenced by every path of the tree"""
+    __slots__ = ('repo', 'base')
+
+    def __init__(self, repo, base):
+        self.repo = repo
+        self.base = base
+
+
 class PygitBackend:
     """GitPath backend based on the ``pygit2`` library
     """
 
     def init_root(self, path, repository_path, rev):
         repo = pygit2.Repository(repository_path)
-        path._gp_repo = repo
-        path._gp_base = repo.revparse_single(rev).peel(pygit2.Tree)
+        base = repo.revparse_single(rev).peel(pygit2.Tree)
+        path._gp_state = _RootState(repo, base)
 
     def init_child(self, parent, child):
-        child._gp_repo = parent._gp_repo
-        child._gp_base = parent._gp_base
+        child._gp_state = parent._gp_state
         return child
 
     def hex(self, path):
-        return str(get_obj(path).id)
+        # Interned so repeated equality checks are pointer compares.
+        return sys.intern(str(get_obj(path).id))
 
     def has_entry(self, path, name):
-        tree = get_obj(path).peel(pygit2.Tree)
-        return name in tree
+        return name in tree_entries(path)
 
     def listdir(self, path):
         obj = get_obj(path)
@@ -57,21 +67,23 @@ class PygitBackend:
             return get_entry(path).filemode
 
 
+@backend_cache('_gp_obj')
 def get_obj(path):
-    try:
-        return path._gp_obj
-    except AttributeError:
-        if path is path.parent:
-            obj = path._gp_base
-        else:
-            obj = path._gp_repo[get_entry(path).id]
-    path._gp_obj = obj
-    return obj
+    if path is path.parent:
+        return path._gp_state.base
+    else:
+        return path._gp_state.repo[get_entry(path).id]
 
 
 def get_entry(path):
     if path is path.parent:
         return None
     else:
-        tree = get_obj(path.parent).peel(pygit2.Tree)
-        return tree[path.name]
+        return tree_entries(path.parent)[path.name]
+
+
+@backend_cache('_gp_entries')
+def tree_entries(path):
+    """Return a name-to-entry mapping of the tree at *path*, cached"""
+    tree = get_obj(path).peel(pygit2.Tree)
+    return {entry.name: entry for entry in tree}
@@ -2,10 +2,13 @@ import subprocess
 import collections
 import functools
 import re
+import sys
+import weakref
 
-from .gp_base import NotATreeError, NotABlobError, get_info
+from .gp_base import ObjectNotFoundError, NotATreeError, NotABlobError
+from .gp_base import get_info
 
-TREE_ENTRY_RE = re.compile(r'^(\d+) (\w+) (\w+)\t(.+)$')
+TREE_ENTRY_RE = re.compile(r'^(\d+) (\w+) (\w+)\t(.+)$', re.ASCII)
 GIT_MODE_TREE = 0o40000
 
 
@@ -18,7 +21,9 @@ def add_assertions(*assertions):
     We can't just do the assertions when functions are called, because
     that would cause infinite loops. Instead, we collect them in the
     ``_assertions`` attribute on the backend, and let the test suite
-    run them after each test.
+    run them after each test.  Entries are deduplicated as they are
+    recorded, keyed by the path's identity -- hashing the path itself
+    would call back into the backend and recurse.
 
     Collection is only done if the ``_assertions`` attribute exists (and is
     a dict). The test suite creates the attribute automatically.
@@ -28,7 +33,8 @@ def add_assertions(*assertions):
         def wrapped(self, path, *args, **kwargs):
             if hasattr(self, '_assertions'):
                 for assertion in assertions:
-                    self._assertions.setdefault(assertion, []).append((func, path))
+                    self._assertions.setdefault(assertion, {})[
+                        func, id(path)] = path
             return func(self, path, *args, **kwargs)
         return wrapped
     return _decorator
@@ -67,9 +73,14 @@ class SubprocessBackend:
         """
 
         path._gp_base = repository_path
-        rev = git_stdout(path, 'rev-parse', rev).strip()
+        path._gp_env = {
+            'HOME': '/dev/null',
+            'GIT_DIR': repository_path,
+        }
+        if not re.match('^[0-9a-f]{40}$', rev):
+            rev = git_stdout(path, 'rev-parse', rev).strip()
         rev = git_stdout(path, 'rev-parse', rev + '^{tree}').strip()
-        path._gp_rev = rev
+        path._gp_rev = sys.intern(rev)
         assert re.match('^[0-9a-f]{40}$', path._gp_rev)
 
     def init_child(self, parent, child):
@@ -80,6 +91,33 @@ class SubprocessBackend:
         ``name`` attribute.
         """
 
+    def batch_command(self, path, flag):
+        """Return a long-lived ``git cat-file`` coprocess for *path*'s repo.
+
+        One process per repository and *flag* (``--batch`` or
+        ``--batch-check``) is spawned on first use and then reused for
+        every later query, instead of forking ``git`` per operation.
+        """
+
+        try:
+            procs = self._gp_batch_procs
+        except AttributeError:
+            procs = self._gp_batch_procs = {}
+        root = path._gp_root
+        key = root._gp_base, flag
+        try:
+            return procs[key]
+        except KeyError:
+            proc = subprocess.Popen(
+                ['git', 'cat-file', flag],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                env=root._gp_env,
+            )
+            weakref.finalize(self, close_batch_command, proc)
+            procs[key] = proc
+            return proc
+
     @add_assertions(existing, canonical)
     def hex(self, path):
         """Return the hexadecimal Object ID corresponding to this path.
@@ -92,9 +130,9 @@ class SubprocessBackend:
         except AttributeError:
             parent_hex = self.hex(path.parent)
             ref = '{}:{}'.format(parent_hex, path.name)
-            rev = git_stdout(path, 'rev-parse', ref).strip()
-            path._gp_rev = rev
-            return rev
+            rev, objtype, size = batch_check(self, path, ref)
+            path._gp_rev = sys.intern(rev)
+            return path._gp_rev
 
     @add_assertions(existing, resolved, only_trees)
     def has_entry(self, path, name):
@@ -124,7 +162,8 @@ class SubprocessBackend:
         Only called on *existing* *canonical* paths.
         """
 
-        return git_stdout(path, 'cat-file', '-t', self.hex(path)).strip()
+        rev, objtype, size = batch_check(self, path, self.hex(path))
+        return objtype
 
     @add_assertions(existing, canonical, only_blobs)
     def read(self, path):
@@ -133,9 +172,7 @@ class SubprocessBackend:
         Only called on *existing* *canonical* paths that identify *blobs*.
         """
 
-        result = call_git(path, 'cat-file', '-p', self.hex(path),
-                          stdout=subprocess.PIPE)
-        return result.stdout
+        return batch_read(self, path, self.hex(path))
 
     @add_assertions(existing, canonical, only_blobs)
     def get_blob_size(self, path):
@@ -144,7 +181,38 @@ class SubprocessBackend:
         Only called on *existing* *canonical* paths that identify *blobs*.
         """
 
-        return int(git_stdout(path, 'cat-file', '-s', self.hex(path)))
+        rev, objtype, size = batch_check(self, path, self.hex(path))
+        return int(size)
+
+    def walk(self, root_path):
+        """Yield ``(dirpath, dirs, files)`` triples, like :func:`os.walk`.
+
+        The whole recursive listing is fetched with a single
+        ``git ls-tree -r -t`` call and cached on the path's root,
+        so walking a tree of any depth costs one subprocess invocation.
+
+        Directory paths are given as slash-separated strings rooted at
+        ``'/'``; *dirs* and *files* are tuples of entry names.
+        """
+
+        root = root_path._gp_root
+        try:
+            full_tree = root._gp_full_tree
+        except AttributeError:
+            full_tree = {}
+            result = git_stdout(root, 'ls-tree', '-r', '-t', '--full-tree',
+                                self.hex(root) + '^{tree}')
+            _match = TREE_ENTRY_RE.match
+            for line in result.splitlines(keepends=False):
+                mode, objtype, sha, name = _match(line).groups()
+                parts = name.split('/')
+                tree = full_tree
+                for part in parts[:-1]:
+                    tree = tree[part][3]
+                children = {} if objtype == 'tree' else None
+                tree[parts[-1]] = int(mode, 8), objtype, sha, children
+            root._gp_full_tree = full_tree
+        yield from walk_tree('/', full_tree)
 
     @add_assertions(existing, canonical)
     def get_mode(self, path):
@@ -159,17 +227,49 @@ class SubprocessBackend:
             return mode
 
 
+def close_batch_command(proc):
+    proc.stdin.close()
+    proc.wait()
+
+
+def batch_check(backend, path, ref):
+    """Look up *ref* through the repo's ``cat-file --batch-check`` pipe.
+
+    Returns a ``(hex, objtype, size)`` triple of strings, or raises
+    :exc:`ObjectNotFoundError` if the object does not exist.
+    """
+
+    proc = backend.batch_command(path, '--batch-check')
+    proc.stdin.write(ref.encode('utf-8') + b'\n')
+    proc.stdin.flush()
+    header = proc.stdout.readline().decode('utf-8').rstrip('\n')
+    if header.endswith(' missing'):
+        raise ObjectNotFoundError(path)
+    rev, objtype, size = header.split()
+    return rev, objtype, size
+
+
+def batch_read(backend, path, ref):
+    """Return the contents of *ref*, via the ``cat-file --batch`` pipe."""
+
+    proc = backend.batch_command(path, '--batch')
+    proc.stdin.write(ref.encode('utf-8') + b'\n')
+    proc.stdin.flush()
+    header = proc.stdout.readline().decode('utf-8').rstrip('\n')
+    if header.endswith(' missing'):
+        raise ObjectNotFoundError(path)
+    rev, objtype, size = header.split()
+    data = proc.stdout.read(int(size) + 1)
+    return data[:-1]
+
+
 def call_git(path, *args, stdout=None):
-    env = {
-        'HOME': '/dev/null',
-        'GIT_DIR': path._gp_root._gp_base,
-    }
     print('calling git', *args)
     result = subprocess.run(
         ['git', *args],
         check=True,
         stdout=stdout,
-        env=env,
+        env=path._gp_root._gp_env,
     )
     return result
 
@@ -179,14 +279,27 @@ def git_stdout(path, *args):
     return result.stdout.decode('utf-8')
 
 
+def walk_tree(dirpath, tree):
+    dirs = tuple(n for n, e in tree.items() if e[3] is not None)
+    files = tuple(n for n, e in tree.items() if e[3] is None)
+    yield dirpath, dirs, files
+    for name in dirs:
+        if dirpath == '/':
+            subpath = '/' + name
+        else:
+            subpath = dirpath + '/' + name
+        yield from walk_tree(subpath, tree[name][3])
+
+
 def ls_tree(backend, path):
     try:
         return path._gp_tree
     except AttributeError:
         entries = collections.OrderedDict()
         result = git_stdout(path, 'ls-tree', backend.hex(path) + '^{tree}')
+        _match = TREE_ENTRY_RE.match
         for line in result.splitlines(keepends=False):
-            mode, objtype, sha, name = TREE_ENTRY_RE.match(line).groups()
+            mode, objtype, sha, name = _match(line).groups()
             entries[name] = int(mode, 8), objtype, sha
     path._gp_tree = entries
     return entries
@@ -1,15 +1,27 @@
 import functools
 
+# functools.cached_property matches the old hand-rolled descriptor's
+# semantics (compute once, store in the instance dict, allow set/del)
+# with a C-level fast path on cache hits.
+reify = functools.cached_property
 
-class reify:
-    def __init__(self, wrapped):
-        self.wrapped = wrapped
-        self.name = self.wrapped.__name__
-        functools.update_wrapper(self, wrapped)
-
-    def __get__(self, obj, owner=None):
-        if obj is None:
-            return self
-        val = self.wrapped(obj)
-        setattr(obj, self.name, val)
-        return val
+
+def backend_cache(attr_name):
+    """Memoize a one-argument function on an attribute of its argument
+
+    The computed value is stored under *attr_name* on the argument
+    itself, so later calls for the same object cost one attribute
+    lookup.  This is ``reify`` for module-level accessor functions,
+    following the ``_gp_*`` attribute convention.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(obj):
+            try:
+                return getattr(obj, attr_name)
+            except AttributeError:
+                value = func(obj)
+                setattr(obj, attr_name, value)
+                return value
+        return wrapper
+    return decorator
@@ -0,0 +1,189 @@
+import getpass
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+import pygit2
+
+import gitpathlib
+from gitpathlib import testutil
+
+from gitpathlib.gp_pygit import PygitBackend
+from gitpathlib.gp_subprocess import SubprocessBackend
+
+# The tests don't check object integrity; skip re-hashing every object
+# libgit2 reads.
+pygit2.option(pygit2.enums.Option.ENABLE_STRICT_HASH_VERIFICATION, 0)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--backends', default='pygit2,/usr/bin/git',
+        help='comma-separated list of GitPath backends to test against')
+
+
+def pytest_configure(config):
+    # The repo fixtures are read-only and session-scoped, so the suite
+    # parallelizes cleanly with ``pytest -n auto`` (pytest-xdist); each
+    # worker gets its own tmp_path_factory base directory.  On Linux,
+    # keep that fixture I/O on tmpfs when no --basetemp was given.
+    # The directory must be unique per run: pytest removes a
+    # user-supplied basetemp wholesale at session start, so concurrent
+    # runs sharing a fixed path would wipe each other's live fixtures.
+    if (config.option.basetemp is None and sys.platform == 'linux'
+            and os.access('/dev/shm', os.W_OK)):
+        config.option.basetemp = tempfile.mkdtemp(
+            prefix='gitpathlib-tests-', dir='/dev/shm')
+
+
+def gp_hex(obj):
+    """Get a gitpathlib object's ID as the 40-char hex string"""
+    hexstring = str(obj.id)
+    assert len(hexstring) == 40, hexstring
+    return hexstring
+
+
+REPO_CONTENTS = [
+    {'tree': {
+        'same': {'file': 'Here are the contents of a file\n'},
+        'same2': {'file': 'Here are the contents of a file\n'},
+        'extra': {
+            'file': 'Here are the contents of a file\n',
+            'extra': 'Here are the contents of a file',
+        },
+        'diff-filename': {'different': 'Here are the contents of a file\n'},
+        'diff-content': {'file': 'Here are different contents\n'},
+    }},
+    {'tree': {
+        'dir': {'file': 'Here are old contents of a file\n'},
+    }},
+    {'tree': {
+        'dir': {
+            'file': 'Here are the contents of a file\n',
+            'link-up': ['link', '..'],
+            'link-dot': ['link', '.'],
+            'link-self-rel': ['link', '../dir'],
+            'link-self-abs': ['link', '/dir'],
+            'subdir': {
+                'file': 'contents',
+                'link-back': ['link', '../..'],
+                'file-utf8': 'ċóňťëñŧş ☺',
+                'file-utf16': ['binary', [255, 254, 11, 1, 243, 0, 72, 1, 101,
+                                          1, 235, 0, 241, 0, 103, 1, 95, 1, 32,
+                                          0, 58, 38]],
+                'file-binary': ['binary', [115, 111, 109, 101, 0, 100, 97, 116,
+                                           97, 255, 255]],
+                'file-lines': 'unix\nwindows\r\nmac\rnone',
+            },
+        },
+        'link': ['link', 'dir/file'],
+        'broken-link': ['link', 'nonexistent-file'],
+        'link-to-dir': ['link', 'dir'],
+        'abs-link': ['link', '/dir/file'],
+        'abs-link-to-dir': ['link', '/dir/'],
+        'abs-broken-link': ['link', '/nonexistent-file'],
+        'self-loop-link': ['link', 'self-loop-link'],
+        'abs-self-loop-link': ['link', '/self-loop-link'],
+        'loop-link-a': ['link', 'loop-link-b'],
+        'loop-link-b': ['link', 'loop-link-a'],
+        'executable': ['executable', '#!/bin/sh'],
+    }},
+]
+
+
+# With pinned signatures, identical contents produce byte-identical
+# repositories, so a built repo can be reused across test runs.
+REPO_DIGEST = hashlib.sha256(repr(REPO_CONTENTS).encode()).hexdigest()[:16]
+
+
+@pytest.fixture(scope='session')
+def testrepo_path(tmp_path_factory):
+    # The cache lives next to basetemp, which can be a shared location
+    # (e.g. /dev/shm), so keep a directory per user.
+    cache_dir = (tmp_path_factory.getbasetemp().parent
+                 / 'gitpathlib-repo-cache-{}'.format(getpass.getuser()))
+    path = cache_dir / REPO_DIGEST
+    if not path.exists():
+        build_path = str(tmp_path_factory.mktemp('repos') / 'testrepo')
+        testutil.make_repo(build_path, REPO_CONTENTS)
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            os.rename(build_path, path)
+        except OSError:
+            # Either another worker renamed its identical copy first,
+            # or the cache is unusable; the freshly built repo serves
+            # this session either way.
+            if not path.exists():
+                return build_path
+    return str(path)
+
+@pytest.fixture(scope='session')
+def testrepo(testrepo_path):
+    return pygit2.Repository(testrepo_path)
+
+@pytest.fixture(params=[
+    pytest.param('pygit2'),
+    pytest.param('/usr/bin/git', marks=pytest.mark.slow),
+])
+def get_path(request, testrepo_path):
+    if request.param not in request.config.getoption('--backends').split(','):
+        pytest.skip('backend {} deselected'.format(request.param))
+    if request.param == 'pygit2':
+        backend = PygitBackend()
+    elif request.param == '/usr/bin/git':
+        backend = SubprocessBackend()
+        backend._assertions = {}
+    else:
+        raise ValueError(request.param)
+    cache = {}
+    def _get_path(*args, **kwargs):
+        if kwargs:
+            kwargs.setdefault('backend', backend)
+            return gitpathlib.GitPath(testrepo_path, *args, **kwargs)
+        try:
+            return cache[args]
+        except KeyError:
+            if len(args) > 1:
+                # Derive from the cached root: the backend resolves
+                # each rev only once per fixture.
+                path = _get_path(args[0]).joinpath(*args[1:])
+            else:
+                path = gitpathlib.GitPath(testrepo_path, *args,
+                                          backend=backend)
+            cache[args] = path
+            return path
+    yield _get_path
+
+    if request.param == '/usr/bin/git':
+        for assertion, paths in backend._assertions.items():
+            print('Assertion:', assertion.__name__)
+            for (func, _), path in paths.items():
+                print('   ', path.root[:7], path.parts[1:],
+                      'in', func.__name__)
+                assertion(path)
+
+@pytest.fixture(scope='session')
+def head_tree_hex(testrepo):
+    return gp_hex(testrepo.head.peel(pygit2.Tree))
+
+@pytest.fixture(scope='session')
+def expected_hex(testrepo):
+    return {spec: gp_hex(testrepo.revparse_single(spec))
+            for spec in ('HEAD:', 'HEAD^:', 'HEAD:dir', 'HEAD:dir/file')}
+
+@pytest.fixture(scope='session')
+def repo_dir(testrepo_path):
+    return os.path.realpath(testrepo_path)
+
+@pytest.fixture(scope='session')
+def part0(repo_dir, head_tree_hex):
+    return repo_dir + ':' + head_tree_hex
+
+@pytest.fixture(scope='session')
+def cloned_repo(tmp_path_factory, testrepo_path):
+    path = str(tmp_path_factory.mktemp('clone') / 'clonedrepo')
+    shutil.copytree(testrepo_path, path, symlinks=True)
+    return pygit2.Repository(path)
@@ -0,0 +1,32 @@
+import pygit2
+import yaml
+
+from gitpathlib import testutil
+
+
+CONTENTS = yaml.safe_load("""
+    - tree:
+        dir:
+            file: |
+                Here are old contents of a file
+    - tree:
+        dir:
+            file: |
+                Here are the contents of a file
+            link: [link, file]
+            subdir:
+                binary-file: [binary, [0, 1, 255]]
+        executable: [executable, '#!/bin/sh']
+""")
+
+
+def test_fastimport_matches_make_repo(tmp_path):
+    slow_path = str(tmp_path / 'slow')
+    fast_path = str(tmp_path / 'fast')
+    testutil.make_repo(slow_path, CONTENTS)
+    testutil.make_repo_fastimport(fast_path, CONTENTS)
+    slow_repo = pygit2.Repository(slow_path)
+    fast_repo = pygit2.Repository(fast_path)
+    for rev in 'HEAD^{tree}', 'HEAD^^{tree}':
+        assert (fast_repo.revparse_single(rev).id
+                == slow_repo.revparse_single(rev).id)
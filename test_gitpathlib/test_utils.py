@@ -25,3 +25,26 @@ def test_reify():
     c.reified = 321
     assert c.reified == 321
     assert memo == ['called', 'called']
+
+
+def test_backend_cache():
+    memo = []
+
+    class Obj:
+        pass
+
+    @util.backend_cache('_cached')
+    def compute(obj):
+        memo.append('called')
+        return 123
+
+    obj = Obj()
+    assert '_cached' not in obj.__dict__
+    assert compute(obj) == 123
+    assert memo == ['called']
+    assert obj._cached == 123
+    assert compute(obj) == 123
+    assert memo == ['called']
+    del obj._cached
+    assert compute(obj) == 123
+    assert memo == ['called', 'called']